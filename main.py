@@ -28,30 +28,36 @@ def main():
     parser.add_argument('--bucket', default='cs528-hw2-jimmyjia')
     parser.add_argument('--prefix', default='generated_htmls/')
     parser.add_argument('--method', default='thread_pool',
-                        choices=['thread_pool', 'transfer_manager', 'sequential', 'gcloud'],
+                        choices=['thread_pool', 'transfer_manager', 'sequential', 'gcloud', 'async'],
                         help="Download strategy (default: thread_pool)")
     parser.add_argument('--anonymous', action='store_true', default=False,
                         help="Use anonymous GCS client (slow, heavily throttled). "
                              "Default: use authenticated client via ADC (fast).")
+    parser.add_argument('--cache', action='store_true', default=False,
+                        help="Reuse parsed links and the NetworkX reference scores from an "
+                             "earlier --cache run with the same bucket/prefix/limit/method "
+                             "(saved under ~/.cache/cs528-pagerank).")
     args = parser.parse_args()
+    if args.method == 'async' and args.anonymous:
+        parser.error("--method async has no anonymous mode (gcloud-aio-storage always uses ADC)")
 
     utils.print_project_banner()
 
     # Stage 1
-    outgoing = pipeline_pagerank.stage1_read_from_gcs.read_gcs_files(
-        args.bucket, args.prefix, method=args.method, limit=args.limit, anonymous=args.anonymous
+    outgoing, graph = pipeline_pagerank.stage1_read_from_gcs.read_gcs_files(
+        args.bucket, args.prefix, method=args.method, limit=args.limit, anonymous=args.anonymous,
+        cache=args.cache,
     )
     # utils.print_dict_sanity_check(outgoing, "Outgoing")
 
     # Stage 2
-    incoming, outgoing_stats, incoming_stats = pipeline_pagerank.stage2_stats.run_stats(outgoing)
-    # utils.print_dict_sanity_check(incoming, "Incoming")
+    incoming, outgoing_stats, incoming_stats = pipeline_pagerank.stage2_stats.run_stats(outgoing, graph=graph)
 
     # Stage 3
-    pr = pipeline_pagerank.stage3_pagerank.compute_pagerank(outgoing, incoming)
+    pr = pipeline_pagerank.stage3_pagerank.compute_pagerank(outgoing, incoming, graph=graph)
 
     # Stage 4
-    pipeline_pagerank.stage4_validation.verify_with_networkx(outgoing, pr)
+    pipeline_pagerank.stage4_validation.verify_with_networkx(outgoing, pr, graph=graph, cache=args.cache)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,127 @@
+# graph.py
+#
+# Project: CS528 HW2 — PageRank Pipeline
+# Author:  Haozhe Jia <jimmyjia@bu.edu>
+# Course:  CS528 Cloud Computing, Boston University, Spring 2026
+#
+# Description:
+#   Compact array form of the link graph, built once at the end of Stage 1
+#   and handed to the later stages.
+#
+#   The dict-of-lists produced by parsing (page_id -> [target ids]) holds one
+#   Python list and one int object per link.  build_csr() flattens it into
+#   CSR (compressed sparse row) arrays:
+#
+#     pages   — sorted page IDs; row i of the graph is page pages[i]
+#     indptr  — row offsets: links of row i are indices[indptr[i]:indptr[i+1]]
+#     indices — link targets as row indices into `pages`
+#
+#   These are exactly the arrays behind a scipy.sparse.csr_matrix, so Stage 3
+#   can wrap them without a Python-level pass over the edges.  transpose_csr()
+#   gives the incoming-link view (row j = pages linking to j) that Stage 2
+#   counts, and top_k() picks the highest-scoring pages for the Stage 3 and
+#   Stage 4 reports.
+#
+# References:
+#   [1] SciPy — scipy.sparse.csr_array
+#       https://docs.scipy.org/doc/scipy/reference/generated/scipy.sparse.csr_array.html
+
+import itertools
+import numpy as np
+
+
+def build_csr(outgoing):
+    """
+    Convert the outgoing link dict into CSR arrays.
+
+    Links whose target is not a page in `outgoing` are dropped.  Repeated
+    links from the same page are kept (callers that want a simple graph
+    deduplicate), so row lengths still count every link in the HTML.
+
+    Args:
+        outgoing (dict): page_id (int) -> list of target page_ids (int)
+
+    Returns:
+        tuple: (pages, indptr, indices)
+            pages   (np.ndarray[int64]): sorted page IDs, length N
+            indptr  (np.ndarray[int64]): row offsets, length N + 1
+            indices (np.ndarray[int32]): target row indices, length E
+    """
+    pages = np.fromiter(sorted(outgoing), dtype=np.int64, count=len(outgoing))
+    n = len(pages)
+
+    counts = np.fromiter((len(outgoing[p]) for p in pages.tolist()), dtype=np.int64, count=n)
+    targets = np.fromiter(
+        itertools.chain.from_iterable(outgoing[p] for p in pages.tolist()),
+        dtype=np.int64, count=int(counts.sum()),
+    )
+
+    # Map target page IDs to row indices; keep only targets that are pages.
+    pos = np.searchsorted(pages, targets)
+    pos[pos == n] = 0
+    valid = pages[pos] == targets
+
+    rows = np.repeat(np.arange(n), counts)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows[valid], minlength=n), out=indptr[1:])
+    indices = pos[valid].astype(np.int32)
+
+    return pages, indptr, indices
+
+
+def transpose_csr(graph):
+    """
+    Reverse every link of a CSR graph from build_csr().
+
+    Row j of the result lists the pages that link to page pages[j], in
+    ascending row order, with repeated links kept — the incoming-link view
+    of the same graph, sharing its `pages` array.
+
+    Args:
+        graph (tuple): (pages, indptr, indices) from build_csr()
+
+    Returns:
+        tuple: (in_indptr, in_indices)
+            in_indptr  (np.ndarray[int64]): row offsets, length N + 1
+            in_indices (np.ndarray[int32]): source row indices, length E
+    """
+    pages, indptr, indices = graph
+    n = len(pages)
+
+    # Stable sort by target keeps each target's sources in row order.
+    rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    in_indices = rows[np.argsort(indices, kind='stable')]
+
+    in_indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=n), out=in_indptr[1:])
+
+    return in_indptr, in_indices
+
+
+def top_k(pages, scores, k=5):
+    """
+    Highest-scoring k pages as [(page_id, score)], best first.
+
+    Same result as a stable sort by descending score cut to k, ties kept in
+    `pages` order, but O(N): np.partition finds the k-th largest score, every
+    page above it is taken, and the remaining slots go to the first pages
+    tied with it.  Only those k are sorted.
+
+    Args:
+        pages: page IDs, aligned with `scores`
+        scores (np.ndarray[float64]): one score per page
+
+    Returns:
+        list: up to k (page_id (int), score (float)) pairs
+    """
+    k = min(k, len(scores))
+    if k == 0:
+        return []
+    # argpartition alone would pick ties at the boundary (and order the k it
+    # returns) arbitrarily, so select by threshold instead.
+    kth = -np.partition(-scores, k - 1)[k - 1]
+    above = np.flatnonzero(scores > kth)
+    tied = np.flatnonzero(scores == kth)[:k - len(above)]
+    top = np.sort(np.concatenate((above, tied)))
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [(int(pages[i]), float(scores[i])) for i in top]
@@ -13,62 +13,167 @@
 #
 #     "thread_pool" (default):
 #       ThreadPoolExecutor + blob.download_to_file() with per-file tqdm updates.
+#       Each blob is parsed straight from its download buffer.
 #
 #     "transfer_manager":
-#       google.cloud.storage.transfer_manager.download_many() — bulk parallel
-#       download with a single tqdm spinner (no per-file granularity since the
-#       API is a single blocking call).
+#       google.cloud.storage.transfer_manager.download_many_to_path() — bulk
+#       download into a temp directory using worker processes (sidesteps the
+#       GIL contention of the client's thread path), then the directory is
+#       parsed in place.  Single tqdm spinner (no per-file granularity
+#       since the API is a single blocking call).
 #
 #     "sequential":
 #       Simple sequential blob.download_as_bytes() loop with tqdm — useful as
-#       a baseline or when thread overhead is undesirable.
+#       a baseline or when thread overhead is undesirable.  Each blob is parsed
+#       as soon as it arrives.
 #
 #     "gcloud":
-#       Shells out to `gcloud storage cp` in batches — fastest on Cloud Shell
-#       where gcloud uses an optimized transfer protocol.
+#       Shells out to a single `gcloud storage cp -I` fed a URI manifest —
+#       fastest on Cloud Shell where gcloud uses an optimized transfer
+#       protocol.
+#
+#     "async":
+#       asyncio + gcloud-aio-storage — one event loop keeps many GETs in
+#       flight over a shared aiohttp session, with no thread-per-request GIL
+#       contention.  Each blob is parsed as soon as it arrives.
+#
+#   The two on-disk strategies ("transfer_manager", "gcloud") leave their
+#   files in a temp directory that _parse_directory() reads and parses with a
+#   process pool, so only the small link lists cross back to this process.
 #
 # References:
 #   [1] Google Cloud Storage Python Client — transfer_manager module
 #       https://cloud.google.com/python/docs/reference/storage/latest/google.cloud.storage.transfer_manager
 #   [2] Downloading objects from GCS
 #       https://cloud.google.com/storage/docs/downloading-objects#download-object-python
+#   [3] gcloud-aio-storage — asyncio client for Google Cloud Storage
+#       https://github.com/talkiq/gcloud-aio/tree/master/storage
 
 import re
 import os
+import hashlib
+import pickle
+import asyncio
 import io
 import subprocess
 import tempfile
 import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from google.cloud import storage
 from google.cloud.storage import transfer_manager
 from tqdm import tqdm
-from pipeline_pagerank.utils import print_stage, print_step, print_success, print_summary_box, Timer
+from pipeline_pagerank.graph import build_csr
+from pipeline_pagerank.utils import (
+    print_stage, print_step, print_success, print_warning, print_summary_box, Timer, CACHE_DIR, atomic_write,
+)
+
+
+# Worker counts, computed once: processes for CPU-bound parsing, and download
+# workers for network-bound GETs.  Every download worker — a thread, or one of
+# transfer_manager's processes — has one request in flight at a time and
+# mostly waits on round trips, so their count is fixed near the measured
+# throughput knee (~30 concurrent GETs) rather than scaled with cores:
+# cpu_count + 4 would leave a 2-vCPU Cloud Shell with only 6 requests in
+# flight, and cpu_count processes with just 2.
+_CPU_COUNT = os.cpu_count() or 4
+_MAX_WORKERS = 32
+
+# Compiled once, bytes mode: matches raw downloaded data without a UTF-8 decode.
+_LINK_RE = re.compile(rb'<a HREF="(\d+)\.html"')
+
+# On-disk strategies write the whole corpus (~2 GB for 20k pages) before it is
+# parsed.  On a RAM-backed tmpfs that write and the read-back are memory
+# copies, so use /dev/shm when it exists and has room; containers often mount
+# it at 64 MB, hence the free-space check.
+_SHM_DIR = '/dev/shm'
+_SHM_MIN_FREE = 4 << 30
+
+
+def parse_html(data):
+    """Extract link target page IDs (int) from raw HTML bytes (or any buffer)."""
+    return [int(m) for m in _LINK_RE.findall(data)]
+
+
+def _temp_root():
+    """Directory for the download temp dir: /dev/shm if large enough, else the system default."""
+    try:
+        st = os.statvfs(_SHM_DIR)
+    except (AttributeError, OSError):
+        return None
+    return _SHM_DIR if st.f_bavail * st.f_frsize >= _SHM_MIN_FREE else None
+
 
+def _page_id(blob_name):
+    """Page ID from a blob name: 'generated_htmls/123.html' -> 123."""
+    # Slice out the digits (names are pre-filtered on '.html'): no split()
+    # list and no replace() scan per file.
+    return int(blob_name[blob_name.rfind('/') + 1:-5])
+
+
+def _read_and_parse(path):
+    """Read one downloaded HTML file and extract its links (worker process)."""
+    # Raw fd + one read() of the file's size: no buffered file object for a
+    # few-KB file.
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return int(os.path.basename(path)[:-5]), parse_html(data)
+
+
+def _parse_directory(directory):
+    """
+    Read and parse every downloaded .html file in `directory`.
+
+    Used by the strategies that download to disk first ("transfer_manager",
+    "gcloud").  The tree is walked, not just its top level:
+    transfer_manager recreates the object path below the prefix, so
+    `<prefix>sub/9.html` lands in `directory/sub/9.html`, and the page set
+    must match the listing the in-memory strategies parse.  The regex scan
+    is CPU-bound and holds the GIL, so files are spread over a
+    ProcessPoolExecutor; chunksize=64 amortizes the IPC cost over many tiny
+    files.
+
+    Returns:
+        dict: page_id (int) -> list of outgoing link target IDs (list[int])
+    """
+    paths = [
+        os.path.join(root, name)
+        for root, _, files in os.walk(directory)
+        for name in files
+        if name.endswith('.html')
+    ]
 
-def parse_html(text):
-    """Extract link targets from HTML content."""
-    return re.findall(r'<a HREF="(\d+)\.html"', text)
+    with ProcessPoolExecutor(max_workers=_CPU_COUNT) as pool:
+        return dict(pool.map(_read_and_parse, paths, chunksize=64))
 
 
 # ---------------------------------------------------------------------------
-#  Download strategies — each returns dict[blob_name, bytes]
+#  Download strategies — in-memory ones parse as they go and return
+#  dict[page_id, links]; on-disk ones fill `dest_dir` for _parse_directory()
 # ---------------------------------------------------------------------------
 
 def _download_thread_pool(blobs, max_workers):
     """
     ThreadPoolExecutor + tqdm progress bar.
 
-    Each blob is downloaded individually in a thread pool. Every completed
-    download ticks the tqdm bar, giving real-time progress with ETA.
+    Each blob is downloaded individually in a thread pool and parsed in the
+    worker straight from the BytesIO buffer (getbuffer() — no getvalue()
+    copy), so raw HTML never accumulates in memory. Every completed
+    download ticks the tqdm bar, giving real-time progress with ETA; the
+    bar redraws at most twice a second however fast the ticks arrive.
     """
-    downloaded = {}
+    outgoing = {}
 
     def _fetch(blob):
         buf = io.BytesIO()
-        blob.download_to_file(buf)
-        return blob.name, buf.getvalue()
+        # Pages are a few KB: one plain GET instead of chunked range requests,
+        # and no client-side hash over every byte (TLS already covers transit).
+        blob.download_to_file(buf, single_shot_download=True, checksum=None)
+        return _page_id(blob.name), parse_html(buf.getbuffer())
 
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
         futures = {pool.submit(_fetch, blob): blob for blob in blobs}
@@ -79,25 +184,25 @@ def _download_thread_pool(blobs, max_workers):
             unit="file",
             bar_format="  {l_bar}{bar:30}{r_bar}",
             ncols=90,
+            mininterval=0.5,
         ) as pbar:
             for future in as_completed(futures):
-                name, data = future.result()
-                downloaded[name] = data
+                page_id, links = future.result()
+                outgoing[page_id] = links
                 pbar.update(1)
 
-    return downloaded
+    return outgoing
 
 
-def _download_transfer_manager(blobs, max_workers):
+def _download_transfer_manager(bucket, blobs, prefix, dest_dir, max_workers):
     """
-    transfer_manager.download_many() with tqdm wrapper.
+    transfer_manager.download_many_to_path() with tqdm wrapper.
 
-    download_many() is a single blocking call with no per-file callback.
-    We show an indeterminate tqdm spinner while it runs, then jump to 100%.
+    Blobs are fetched straight to files in `dest_dir` by a pool of worker
+    processes — no BytesIO round-trip.  download_many_to_path() is a single
+    blocking call with no per-file callback, so the tqdm bar jumps to 100%
+    when it returns.
     """
-    file_objects = [io.BytesIO() for _ in blobs]
-    blob_file_pairs = list(zip(blobs, file_objects))
-
     with tqdm(
         total=len(blobs),
         desc="  Downloading",
@@ -105,179 +210,310 @@ def _download_transfer_manager(blobs, max_workers):
         bar_format="  {l_bar}{bar:30}{r_bar}",
         ncols=90,
     ) as pbar:
-        transfer_manager.download_many(
-            blob_file_pairs,
+        transfer_manager.download_many_to_path(
+            bucket,
+            [b.name[len(prefix):] for b in blobs],
+            destination_directory=dest_dir,
+            blob_name_prefix=prefix,
+            download_kwargs={'single_shot_download': True, 'checksum': None},
             max_workers=max_workers,
-            worker_type='thread',
+            worker_type=transfer_manager.PROCESS,
             raise_exception=True,
         )
         pbar.update(len(blobs))
 
-    return {
-        blob.name: fobj.getvalue()
-        for blob, fobj in zip(blobs, file_objects)
-    }
-
 
 def _download_sequential(blobs):
     """
     Simple sequential download with tqdm.
 
-    Downloads blobs one at a time — no threading. Useful as a baseline
-    or for debugging. tqdm updates after every file.
+    Downloads blobs one at a time — no threading — parsing each one as it
+    arrives. Useful as a baseline or for debugging. tqdm updates after
+    every file.
     """
-    downloaded = {}
+    outgoing = {}
     with tqdm(
         total=len(blobs),
         desc="  Downloading",
         unit="file",
         bar_format="  {l_bar}{bar:30}{r_bar}",
         ncols=90,
+        mininterval=0.5,
     ) as pbar:
         for blob in blobs:
-            data = blob.download_as_bytes()
-            downloaded[blob.name] = data
+            data = blob.download_as_bytes(single_shot_download=True, checksum=None)
+            outgoing[_page_id(blob.name)] = parse_html(data)
             pbar.update(1)
 
-    return downloaded
+    return outgoing
 
 
-def _download_gcloud(blobs, bucket_name, prefix):
+def _download_gcloud(uris, dest_dir, max_workers):
     """
-    gcloud storage cp in batches with tqdm.
+    One gcloud storage cp run fed a manifest, with tqdm.
 
-    Shells out to `gcloud storage cp` for each batch of URIs.
+    All object URIs are written to a manifest that a single
+    `gcloud storage cp -I` process reads on stdin, so gcloud starts up,
+    authenticates and warms its connection pool once for the whole set
+    instead of once per batch.  The URIs come from the same list_blobs()
+    listing as every other strategy, so all methods read the same page set.
     Fastest on Cloud Shell where gcloud uses an optimized transfer protocol.
-    tqdm updates after each batch completes.
+    tqdm follows the number of files that have landed in `dest_dir` while
+    gcloud runs.
+
+    gcloud's per-process thread count (default 4) is raised to `max_workers`
+    through its storage/thread_count property, and per-file "Copying ..."
+    output is disabled so stderr only ever holds errors.
     """
-    temp_dir = tempfile.mkdtemp(prefix='gcs_download_')
-    batch_size = 200
+    env = dict(os.environ, CLOUDSDK_STORAGE_THREAD_COUNT=str(max_workers))
+
+    # Manifest and stderr go through temp files rather than pipes, so
+    # neither side can stall on a full pipe buffer while we poll progress.
+    with tempfile.TemporaryFile('w+') as manifest, \
+            tempfile.TemporaryFile('w+') as errors, \
+            tqdm(
+                total=len(uris),
+                desc="  Downloading",
+                unit="file",
+                bar_format="  {l_bar}{bar:30}{r_bar}",
+                ncols=90,
+            ) as pbar:
+        manifest.write("\n".join(uris) + "\n")
+        manifest.seek(0)
+
+        proc = subprocess.Popen(
+            ['gcloud', 'storage', 'cp', '-r', '-I', '--no-user-output-enabled', dest_dir],
+            stdin=manifest, stdout=subprocess.DEVNULL, stderr=errors, text=True, env=env,
+        )
+        returncode = None
+        while returncode is None:
+            try:
+                returncode = proc.wait(timeout=0.5)
+            except subprocess.TimeoutExpired:
+                pass
+            done = sum(name.endswith('.html') for name in os.listdir(dest_dir))
+            pbar.update(done - pbar.n)
 
+        if returncode != 0:
+            errors.seek(0)
+            print(f"\n  [WARN] gcloud storage cp error: {errors.read().strip()}")
+
+
+def _download_async(blobs, bucket_name, concurrency=64):
+    """
+    asyncio + gcloud-aio-storage with tqdm.
+
+    All GETs are issued from one event loop over a shared aiohttp session;
+    an asyncio.Semaphore caps how many are in flight.  The session's
+    connector keeps exactly `concurrency` keep-alive sockets and caches the
+    storage host's DNS answer for the whole run.  Each blob is parsed as
+    soon as its bytes arrive.  Uses Application Default Credentials (there
+    is no anonymous mode).
+    """
+    # Optional backend: imported here so the other strategies run without it.
     try:
-        all_uris = [f"gs://{bucket_name}/{b.name}" for b in blobs]
-        total = len(all_uris)
-        num_batches = (total + batch_size - 1) // batch_size
+        import aiohttp
+        from gcloud.aio.storage import Storage
+    except ImportError as e:
+        raise ImportError(
+            "--method async needs the gcloud-aio-storage and aiohttp packages "
+            "(pip install gcloud-aio-storage aiohttp)"
+        ) from e
+
+    outgoing = {}
+
+    async def _fetch_all(pbar):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+
+        async with aiohttp.ClientSession(connector=connector) as session, \
+                Storage(session=session) as client:
+            async def _fetch(blob_name):
+                async with semaphore:
+                    data = await client.download(bucket_name, blob_name)
+                outgoing[_page_id(blob_name)] = parse_html(data)
+                pbar.update(1)
 
-        with tqdm(
-            total=total,
-            desc="  Downloading",
-            unit="file",
-            bar_format="  {l_bar}{bar:30}{r_bar}",
-            ncols=90,
-        ) as pbar:
-            for i in range(0, total, batch_size):
-                batch = all_uris[i:i + batch_size]
-
-                result = subprocess.run(
-                    ['gcloud', 'storage', 'cp', '-r'] + batch + [temp_dir],
-                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
-                )
-                if result.returncode != 0:
-                    batch_num = i // batch_size + 1
-                    print(f"\n  [WARN] Batch {batch_num} error: {result.stderr.strip()}")
-
-                pbar.update(len(batch))
-
-        # Read downloaded files back into memory
-        downloaded = {}
-        for root, dirs, files in os.walk(temp_dir):
-            for file in files:
-                if file.endswith('.html'):
-                    filepath = os.path.join(root, file)
-                    blob_name = f"{prefix}{file}"
-                    with open(filepath, 'rb') as f:
-                        downloaded[blob_name] = f.read()
-
-        return downloaded
+            await asyncio.gather(*(_fetch(b.name) for b in blobs))
 
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    with tqdm(
+        total=len(blobs),
+        desc="  Downloading",
+        unit="file",
+        bar_format="  {l_bar}{bar:30}{r_bar}",
+        ncols=90,
+        mininterval=0.5,
+    ) as pbar:
+        asyncio.run(_fetch_all(pbar))
+
+    return outgoing
 
 
 # ---------------------------------------------------------------------------
 #  Main entry point
 # ---------------------------------------------------------------------------
 
-def read_gcs_files(bucket_name, prefix="generated_htmls/", method="thread_pool", limit=None, anonymous=False):
+def _download_and_parse(bucket_name, prefix, method, limit, anonymous):
+    """
+    Steps 1-3 of read_gcs_files(): list, download and parse.
+
+    Returns:
+        dict: page_id (int) -> list of outgoing link target IDs (list[int])
+    """
+    if method == "async" and anonymous:
+        # gcloud-aio-storage always authenticates; running anyway would time
+        # an authenticated download under an "anonymous" label.
+        raise ValueError("method 'async' has no anonymous mode; drop anonymous=True or pick another method")
+
+    # --- Step 1: List blobs ---
+    max_workers = _MAX_WORKERS
+
+    if anonymous:
+        # Anonymous client — no credentials needed, but Google throttles
+        # anonymous API requests aggressively (~7s/file observed).
+        print_step(f"Connecting to bucket: {bucket_name} (anonymous)")
+        client = storage.Client.create_anonymous_client()
+    else:
+        # Authenticated client via ADC — uses Cloud Shell's credentials.
+        # Much higher rate limits.  Transport is JSON/HTTP: the library's
+        # gRPC GrpcClient is a bare GAPIC client without the Bucket/Blob
+        # API the strategies below are built on.
+        print_step(f"Connecting to bucket: {bucket_name} (authenticated)")
+        client = storage.Client()
+
+    # The client's requests session keeps at most 10 connections per host
+    # by default; size the pool for every download thread so connections
+    # (and their TLS sessions) are reused instead of discarded.
+    client._http.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+    bucket = client.bucket(bucket_name)
+
+    # Only the name is needed to download a blob, so the field mask drops
+    # size/md5/etag/timestamps/etc. from every listed item.  1000 is the
+    # largest page the JSON API returns.
+    with Timer("Listing blobs"):
+        listing = bucket.list_blobs(
+            prefix=prefix, page_size=1000, fields='items(name),nextPageToken',
+        )
+        blobs = [b for b in listing if b.name.endswith('.html')]
+    print_success(f"Found {len(blobs)} HTML files")
+
+    if limit is not None and limit < len(blobs):
+        blobs = blobs[:limit]
+        print_success(f"Limiting to {limit} files")
+
+    # --- Step 2: Download ---
+    print_step(f"Downloading {len(blobs)} files [{method}] ...")
+
+    # In-memory strategies parse as they download and are done here.
+    if method in ("thread_pool", "sequential", "async"):
+        with Timer("Download"):
+            if method == "thread_pool":
+                return _download_thread_pool(blobs, max_workers)
+            elif method == "sequential":
+                return _download_sequential(blobs)
+            else:
+                return _download_async(blobs, bucket_name)
+
+    if method not in ("transfer_manager", "gcloud"):
+        raise ValueError(f"Unknown download method: {method!r}")
+
+    # On-disk strategies fill a temp dir that Step 3 parses.
+    temp_dir = tempfile.mkdtemp(prefix='gcs_download_', dir=_temp_root())
+
+    try:
+        with Timer("Download"):
+            if method == "transfer_manager":
+                _download_transfer_manager(bucket, blobs, prefix, temp_dir, max_workers)
+            else:
+                uris = [f"gs://{bucket_name}/{b.name}" for b in blobs]
+                _download_gcloud(uris, temp_dir, max_workers)
+
+        # --- Step 3: Parse HTML downloaded to disk ---
+        print_step("Parsing HTML files for links...")
+        with Timer("Parsing"):
+            return _parse_directory(temp_dir)
+
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _cache_path(bucket_name, prefix, limit, method, anonymous):
+    """Cache file for the parsed links of one (bucket, prefix, limit) selection read with one method."""
+    # method/anonymous are part of the key so that switching strategy (the
+    # point of a download-timing comparison) really downloads again.
+    key = hashlib.sha256(f"{bucket_name}|{prefix}|{limit}|{method}|{anonymous}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{key}.pkl")
+
+
+def read_gcs_files(bucket_name, prefix="generated_htmls/", method="thread_pool", limit=None, anonymous=False,
+                   cache=False):
     """
     Read and parse all HTML files from a GCS bucket.
 
     Step 1: List all blobs under `prefix`.
     Step 2: Download them using the chosen method (all with tqdm progress).
-    Step 3: Parse HTML to extract outgoing links.
+            In-memory methods parse each blob as it arrives.
+    Step 3: Parse HTML downloaded to disk to extract outgoing links.
+    Step 4: Flatten the links into CSR arrays (see graph.build_csr).
+
+    With `cache`, Steps 1-3 are replaced by loading the parsed links of an
+    earlier run over the same bucket, prefix and limit with the same method
+    and client, if there is one (no download is timed then); otherwise they
+    run as usual and their result is saved for the next run.
 
     Args:
         bucket_name (str): Name of the GCS bucket (e.g., 'cs528-hw2-jimmyjia')
         prefix (str): Folder prefix within the bucket (e.g., 'generated_htmls/')
         method (str): Download strategy — one of:
             "thread_pool"       — ThreadPoolExecutor + per-file tqdm (default)
-            "transfer_manager"  — transfer_manager.download_many() + tqdm
+            "transfer_manager"  — download_many_to_path() (processes) + tqdm
             "sequential"        — one-by-one download + tqdm
-            "gcloud"            — gcloud storage cp in batches + tqdm
+            "gcloud"            — one gcloud storage cp -I run + tqdm
+            "async"             — asyncio + gcloud-aio-storage + tqdm
         limit (int, optional): Maximum number of files to download.
         anonymous (bool): If True, use anonymous client (no credentials needed but
             heavily throttled by Google). If False (default), use authenticated
             client via ADC — much faster in Cloud Shell where credentials are
-            already configured.
+            already configured.  Not supported by "async" (ValueError).
+        cache (bool): Reuse / save parsed links under ~/.cache/cs528-pagerank.
 
     Returns:
-        dict: page_id (str) -> list of outgoing link target IDs (list[str])
+        tuple: (outgoing, graph)
+            outgoing (dict): page_id (int) -> list of outgoing link target IDs (list[int])
+            graph (tuple): (pages, indptr, indices) CSR arrays from build_csr()
     """
     print_stage("Read", "Parse HTML files from GCS")
 
     with Timer("Total Stage 1"):
 
-        # --- Step 1: List blobs ---
-        if anonymous:
-            # Anonymous client — no credentials needed, but Google throttles
-            # anonymous API requests aggressively (~7s/file observed).
-            print_step(f"Connecting to bucket: {bucket_name} (anonymous)")
-            client = storage.Client.create_anonymous_client()
-        else:
-            # Authenticated client via ADC — uses Cloud Shell's credentials.
-            # Much higher rate limits and potentially gRPC transport.
-            print_step(f"Connecting to bucket: {bucket_name} (authenticated)")
-            client = storage.Client()
-        bucket = client.bucket(bucket_name)
+        cache_path = _cache_path(bucket_name, prefix, limit, method, anonymous) if cache else None
 
-        with Timer("Listing blobs"):
-            blobs = [b for b in bucket.list_blobs(prefix=prefix) if b.name.endswith('.html')]
-        print_success(f"Found {len(blobs)} HTML files")
+        if cache_path is not None and os.path.exists(cache_path):
+            print_warning(f"Cache hit — skipping download [{method}]; download time is NOT measured this run")
+            print_step(f"Loading parsed links from cache: {cache_path}")
+            with Timer("Loading cache"):
+                with open(cache_path, 'rb') as f:
+                    outgoing = pickle.load(f)
+        else:
+            outgoing = _download_and_parse(bucket_name, prefix, method, limit, anonymous)
 
-        if limit is not None and limit < len(blobs):
-            blobs = blobs[:limit]
-            print_success(f"Limiting to {limit} files")
+            if cache_path is not None:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with atomic_write(cache_path) as f:
+                    pickle.dump(outgoing, f, protocol=pickle.HIGHEST_PROTOCOL)
+                print_success(f"Cached parsed links to {cache_path}")
 
-        # --- Step 2: Download ---
-        max_workers = min(32, (os.cpu_count() or 4) + 4)
-        print_step(f"Downloading {len(blobs)} files [{method}] ...")
-
-        with Timer("Download"):
-            if method == "thread_pool":
-                downloaded = _download_thread_pool(blobs, max_workers)
-            elif method == "transfer_manager":
-                downloaded = _download_transfer_manager(blobs, max_workers)
-            elif method == "sequential":
-                downloaded = _download_sequential(blobs)
-            elif method == "gcloud":
-                downloaded = _download_gcloud(blobs, bucket_name, prefix)
-            else:
-                raise ValueError(f"Unknown download method: {method!r}")
-
-        # --- Step 3: Parse HTML ---
-        print_step("Parsing HTML files for links...")
-        with Timer("Parsing"):
-            outgoing = {}
-            for name, data in downloaded.items():
-                page_id = name.split('/')[-1].replace('.html', '')
-                outgoing[page_id] = parse_html(data.decode('utf-8'))
+        # --- Step 4: CSR arrays ---
+        with Timer("Building CSR arrays"):
+            graph = build_csr(outgoing)
 
         # --- Summary ---
-        total_links = sum(len(v) for v in outgoing.values())
+        total_links = sum(map(len, outgoing.values()))
         print_summary_box("Stage 1 Summary", {
             "Files parsed": len(outgoing),
             "Total outgoing links": total_links,
             "Avg links/file": f"{total_links / len(outgoing):.1f}",
         })
 
-    return outgoing
+    return outgoing, graph
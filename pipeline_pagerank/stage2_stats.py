@@ -9,62 +9,71 @@
 #   (min, max, average, median, quintiles) for both directions.
 
 import numpy as np
+from pipeline_pagerank.graph import build_csr, transpose_csr
 from pipeline_pagerank.utils import print_stage, print_step, print_success, print_side_by_side_boxes, Timer
 
 
-def build_incoming(outgoing):
+def build_incoming(outgoing, graph=None):
     """
-    Build incoming link dictionary from outgoing links.
+    Build the incoming link index from outgoing links.
+
+    The index is the transpose of the Stage 1 CSR graph, so it is built with
+    array operations instead of one dict append per link.  Links to pages
+    outside the set are not indexed; repeated links are kept.
 
     Args:
         outgoing (dict): page_id -> list of target page_ids
+        graph (tuple): (pages, indptr, indices) CSR arrays from Stage 1;
+                       built from `outgoing` if not given
 
     Returns:
-        dict: page_id -> list of source page_ids that link to it
+        tuple: (in_indptr, in_indices) — sources of page pages[j] are
+               pages[in_indices[in_indptr[j]:in_indptr[j+1]]]
     """
-    incoming = {page_id: [] for page_id in outgoing}
-
-    for source, targets in outgoing.items():
-        for target in targets:
-            if target in incoming:
-                incoming[target].append(source)
-
-    return incoming
+    if graph is None:
+        graph = build_csr(outgoing)
+    return transpose_csr(graph)
 
 
 def compute_link_stats(link_counts):
     """
     Compute statistics for a list of link counts.
 
+    All five order statistics come from one np.quantile call, so the values
+    are partitioned once rather than once per percentile.
+
     Args:
-        link_counts (list[int]): Number of links per page
+        link_counts (array-like[int]): Number of links per page
 
     Returns:
         dict: Computed statistics (all values as strings for display)
     """
-    values = np.array(link_counts)
+    values = np.asarray(link_counts)
+    q20, q40, median, q60, q80 = np.quantile(values, [0.2, 0.4, 0.5, 0.6, 0.8])
 
     return {
         "Min": int(np.min(values)),
         "Max": int(np.max(values)),
         "Average": f"{np.mean(values):.2f}",
-        "Median": f"{np.median(values):.2f}",
-        "Q1 (20th)": f"{np.percentile(values, 20):.2f}",
-        "Q2 (40th)": f"{np.percentile(values, 40):.2f}",
-        "Q3 (60th)": f"{np.percentile(values, 60):.2f}",
-        "Q4 (80th)": f"{np.percentile(values, 80):.2f}",
+        "Median": f"{median:.2f}",
+        "Q1 (20th)": f"{q20:.2f}",
+        "Q2 (40th)": f"{q40:.2f}",
+        "Q3 (60th)": f"{q60:.2f}",
+        "Q4 (80th)": f"{q80:.2f}",
     }
 
 
-def run_stats(outgoing):
+def run_stats(outgoing, graph=None):
     """
     Build incoming links and compute statistics for both directions.
 
     Args:
         outgoing (dict): page_id -> list of outgoing link targets
+        graph (tuple): (pages, indptr, indices) CSR arrays from Stage 1;
+                       built from `outgoing` if not given
 
     Returns:
-        tuple: (incoming dict, outgoing_stats dict, incoming_stats dict)
+        tuple: (incoming CSR tuple, outgoing_stats dict, incoming_stats dict)
     """
     print_stage("Stats", "Computing link statistics")
 
@@ -72,12 +81,12 @@ def run_stats(outgoing):
         # Step 1: Build incoming links from outgoing
         print_step("Building incoming link index...")
         with Timer("Building incoming links"):
-            incoming = build_incoming(outgoing)
+            incoming = build_incoming(outgoing, graph)
 
         # Step 2: Compute stats for both directions
         print_step("Computing link statistics...")
-        outgoing_counts = [len(v) for v in outgoing.values()]
-        incoming_counts = [len(v) for v in incoming.values()]
+        outgoing_counts = np.fromiter(map(len, outgoing.values()), dtype=np.int64, count=len(outgoing))
+        incoming_counts = np.diff(incoming[0])
         outgoing_stats = compute_link_stats(outgoing_counts)
         incoming_stats = compute_link_stats(incoming_counts)
 
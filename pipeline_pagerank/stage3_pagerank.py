@@ -35,8 +35,9 @@
 #      instead of Python dicts — enables C-level vectorized operations.
 #   2. Row-normalize the adjacency matrix into a right-stochastic matrix
 #      so that A[i][j] = 1/C(i) when page i links to page j.
-#   3. Use left matrix-vector multiplication (x @ A) to compute all
-#      incoming contributions in one shot, replacing nested Python loops.
+#   3. Use one matrix-vector product per iteration (x @ A, computed here as
+#      A^T @ x on a precomputed transpose) to gather all incoming
+#      contributions in one shot, replacing nested Python loops.
 #   4. Handle dangling nodes (pages with no outgoing links) by collecting
 #      their total rank and redistributing it uniformly to all pages.
 #   5. L1-normalize the rank vector after each iteration to prevent
@@ -44,10 +45,11 @@
 
 import numpy as np
 import scipy.sparse as sp
+from pipeline_pagerank.graph import build_csr, top_k
 from pipeline_pagerank.utils import print_stage, print_step, print_success, print_summary_box, Timer
 
 
-def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200):
+def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200, graph=None):
     """
     Compute PageRank using power iteration with sparse matrix operations.
 
@@ -66,45 +68,45 @@ def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200):
     are needed to lock in the final ranking order.  [ref: §5 of [2]]
 
     Args:
-        outgoing: page_id (str) -> list of target page_ids
-        incoming: page_id (str) -> list of source page_ids (unused in matrix path,
-                  kept for API compatibility)
+        outgoing: page_id (int) -> list of target page_ids
+        incoming: (in_indptr, in_indices) incoming-link CSR from Stage 2
+                  (unused in matrix path, kept for API compatibility)
         damping:  damping factor d (default 0.85)
         max_iterations: cap on iteration count
+        graph:    (pages, indptr, indices) CSR arrays from Stage 1; built from
+                  `outgoing` if not given
 
     Returns:
-        dict: page_id (str) -> PageRank score (float)
+        dict: page_id (int) -> PageRank score (float)
     """
     print_stage("PageRank", "Computing PageRank scores")
 
     with Timer("Total Stage 3"):
-        n = len(outgoing)
-        pages = sorted(outgoing.keys(), key=int)
-        page_to_idx = {page: i for i, page in enumerate(pages)}
+        if graph is None:
+            graph = build_csr(outgoing)
+        pages, indptr, indices = graph
+        n = len(pages)
 
         # ---------------------------------------------------------------
         # Step 1 — Build sparse adjacency matrix  [ref: NetworkX idea #1]
         # ---------------------------------------------------------------
         # A[i][j] = 1 means page i has an outgoing link to page j.
-        # We only add edges whose target exists in our page set.
+        # The CSR arrays from Stage 1 already hold only edges whose target
+        # exists in our page set, so they are wrapped directly.
         #
         # Deduplicate: if page A links to page B multiple times in the HTML,
         # it counts as one edge (weight 1), matching how NetworkX's DiGraph
-        # handles repeated add_edge() calls.  Without this, csr_matrix sums
-        # duplicate (row, col) pairs, giving repeated links extra weight and
-        # producing a different stochastic matrix than NetworkX.
+        # handles repeated add_edge() calls.  sum_duplicates() merges repeated
+        # (row, col) pairs; resetting data to 1 then drops the extra weight
+        # they would otherwise carry in the stochastic matrix.
         print_step("Building sparse adjacency matrix...")
-        rows, cols = [], []
-        for source, targets in outgoing.items():
-            src_idx = page_to_idx[source]
-            for target in set(targets):  # set() deduplicates per source
-                if target in page_to_idx:
-                    rows.append(src_idx)
-                    cols.append(page_to_idx[target])
-
-        data = np.ones(len(rows), dtype=np.float64)
-        A = sp.csr_matrix((data, (rows, cols)), shape=(n, n))
-        print_success(f"Matrix: {n} nodes, {len(rows)} unique edges")
+        # copy=True: sum_duplicates() works in place, and the Stage 1 arrays
+        # are shared with Stages 2 and 4.
+        data = np.ones(len(indices), dtype=np.float64)
+        A = sp.csr_matrix((data, indices, indptr), shape=(n, n), copy=True)
+        A.sum_duplicates()
+        A.data[:] = 1.0
+        print_success(f"Matrix: {n} nodes, {A.nnz} unique edges")
 
         # ---------------------------------------------------------------
         # Step 2 — Row-normalize into stochastic matrix  [ref: idea #2]
@@ -112,30 +114,43 @@ def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200):
         # Divide each row by its sum (= out-degree of that page).
         # After this, A[i][j] = 1/C(i) if page i links to page j.
         # This encodes the "PR(Ti)/C(Ti)" term from the formula.
-        out_degree = np.array(A.sum(axis=1)).flatten()       # row sums
+        # Every stored entry is 1.0 after deduplication, so a row's sum is its
+        # entry count — read straight off indptr, no pass over the values.
+        out_degree = np.diff(A.indptr).astype(np.float64)    # row sums
         is_dangling = np.where(out_degree == 0)[0]           # save before modifying
         out_degree[out_degree == 0] = 1.0                    # avoid /0 for dangling
         D_inv = sp.diags(1.0 / out_degree)
         A = D_inv @ A                                        # row-normalized
 
+        # x @ A on a CSR matrix runs scipy's column-scatter kernel over A's
+        # implicit CSC transpose.  A is fixed for every iteration, so store
+        # A^T as CSR once and compute the same product as A^T @ x — a
+        # row-gather kernel that streams indices and x contiguously.
+        # The damping factor is folded into its values once, so no iteration
+        # has to scale the mat-vec result.
+        A_T = A.T.tocsr()
+        A_T.data *= damping
+
         # ---------------------------------------------------------------
         # Step 3 — Prepare initial rank vector and uniform distribution
         # ---------------------------------------------------------------
         # Uniform start: every page begins with PR = 1/N  [ref: formula in [1]]
         x = np.full(n, 1.0 / n, dtype=np.float64)
 
-        # Uniform teleport vector: (1-d)/N applied to every page
-        teleport = np.full(n, (1.0 - damping) / n, dtype=np.float64)
+        # Uniform teleport term: (1-d)/N added to every page.  It is the same
+        # for all pages, so a scalar is enough — no length-N vector to stream.
+        teleport = (1.0 - damping) / n
 
         # ---------------------------------------------------------------
         # Step 4 — Power iteration  [ref: ideas #3, #4, #5]
         # ---------------------------------------------------------------
         # Each iteration computes:
-        #   x_new = (1-d)/N  +  d * (x @ A  +  dangling_sum / N)
+        #   x_new = A_T @ x  +  d * dangling_sum / N  +  (1-d)/N
         #
-        #   x @ A          — left-multiply: for each page j, sums up
-        #                    x[i] * A[i][j] = PR(i)/C(i) over all i→j.
-        #                    This is the vectorized form of Σ PR(Ti)/C(Ti).
+        #   A_T @ x        — A_T = d * A^T from Step 2, so for each page j this
+        #                    sums d * x[i] * A[i][j] = d * PR(i)/C(i) over all
+        #                    i→j: the vectorized form of d * Σ PR(Ti)/C(Ti),
+        #                    equal to d * (x @ A).
         #
         #   dangling_sum   — total rank held by dangling pages (no out-links).
         #                    Redistributed uniformly to all N pages, so each
@@ -150,19 +165,28 @@ def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200):
         fine_tol = n * 1.0e-6
         hw_converged_at = None
 
+        # Scratch buffer for x - x_prev, reused by every iteration.
+        delta = np.empty(n, dtype=np.float64)
+
         print_step("Running power iterations...")
         for iteration in range(max_iterations):
-            x_prev = x.copy()
+            # A_T @ x returns a fresh array, so holding on to the old one is
+            # enough — no copy needed.
+            x_prev = x
 
+            # The dangling share and the teleport term are both uniform, so
+            # they fold into one scalar added in place after the mat-vec.
             dangling_sum = x[is_dangling].sum()
-            x = damping * (x @ A + dangling_sum / n) + teleport
+            x = A_T @ x                                      # == d * (x @ A)
+            x += damping * dangling_sum / n + teleport
 
             # L1-normalize: keep sum(x) == 1.0 to prevent floating-point drift
             # across many iterations.  [ref: idea #5]
             x /= x.sum()
 
             # Convergence metrics
-            diff = np.abs(x - x_prev).sum()
+            np.subtract(x, x_prev, out=delta)
+            diff = np.abs(delta, out=delta).sum()
             change_pct = diff / x_prev.sum()
 
             # Phase 1: log when document required 0.5% threshold is first met
@@ -183,9 +207,8 @@ def compute_pagerank(outgoing, incoming, damping=0.85, max_iterations=200):
         # ---------------------------------------------------------------
         # Step 5 — Map back to page IDs and report top 5
         # ---------------------------------------------------------------
-        pr = {pages[i]: float(x[i]) for i in range(n)}
-
-        top5 = sorted(pr.items(), key=lambda item: item[1], reverse=True)[:5]
+        pr = dict(zip(pages.tolist(), x.tolist()))
+        top5 = top_k(pages, x)
         print_summary_box("Top 5 Pages by PageRank", {
             f"Page {page}": f"{score:.8f}" for page, score in top5
         })
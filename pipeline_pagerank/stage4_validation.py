@@ -45,20 +45,31 @@
 #   Top-K level:  Precision@5 (set overlap) and positional rank match.
 
 import os
+import hashlib
+import itertools
 import numpy as np
 from scipy.stats import spearmanr, kendalltau, rankdata
 import matplotlib
 matplotlib.use('Agg')  # non-interactive backend for saving to file
 import matplotlib.pyplot as plt
 import networkx as nx
+from pipeline_pagerank.graph import build_csr, top_k
 from pipeline_pagerank.utils import (
     print_stage, print_step, print_success, print_summary_box,
-    print_side_by_side_boxes, Timer,
+    print_side_by_side_boxes, Timer, CACHE_DIR, atomic_write,
 )
 
 DOCS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'docs')
 
 
+def _nx_cache_path(graph, alpha):
+    """Cache file for nx.pagerank() of one CSR graph (and NetworkX version)."""
+    h = hashlib.blake2b(f"{nx.__version__}|{alpha}".encode(), digest_size=16)
+    for arr in graph:
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return os.path.join(CACHE_DIR, f"nxpr_{h.hexdigest()}.npz")
+
+
 def _plot_validation(custom_scores, nx_scores, rho, tau, out_dir):
     """
     Generate two side-by-side plots and save to docs/.
@@ -109,7 +120,7 @@ def _plot_validation(custom_scores, nx_scores, rho, tau, out_dir):
     return path
 
 
-def verify_with_networkx(outgoing, custom_pr):
+def verify_with_networkx(outgoing, custom_pr, graph=None, cache=False):
     """
     Verify custom PageRank against NetworkX's built-in PageRank.
 
@@ -125,26 +136,54 @@ def verify_with_networkx(outgoing, custom_pr):
     Args:
         outgoing (dict): page_id -> list of outgoing link targets
         custom_pr (dict): page_id -> custom PageRank score
+        graph (tuple): (pages, indptr, indices) CSR arrays from Stage 1;
+                       built from `outgoing` if not given
+        cache (bool): Reuse / save the NetworkX scores under CACHE_DIR.
     """
     print_stage("Verify", "Comparing with NetworkX PageRank")
 
     with Timer("NetworkX verification"):
-        # --- Build NetworkX graph and compute reference PageRank ---
-        print_step("Building NetworkX DiGraph...")
-        G = nx.DiGraph()
-        for source, targets in outgoing.items():
-            for target in targets:
-                if target in outgoing:
-                    G.add_edge(source, target)
-        print_success(f"Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-
-        print_step("Computing NetworkX PageRank...")
-        nx_pr = nx.pagerank(G, alpha=0.85)
+        if graph is None:
+            graph = build_csr(outgoing)
+        alpha = 0.85
+        cache_path = _nx_cache_path(graph, alpha) if cache else None
+
+        if cache_path is not None and os.path.exists(cache_path):
+            print_step(f"Loading NetworkX PageRank from cache: {cache_path}")
+            with np.load(cache_path) as cached:
+                nx_pr = dict(zip(cached['nodes'].tolist(), cached['scores'].tolist()))
+        else:
+            # --- Build NetworkX graph and compute reference PageRank ---
+            print_step("Building NetworkX DiGraph...")
+            # The CSR arrays already hold only in-set targets, so the edge list
+            # is two array lookups and one add_edges_from() call instead of a
+            # membership test and add_edge() per link.  As before, a page enters
+            # G only through an edge, and repeated links collapse to one edge.
+            row_pages, indptr, indices = graph
+            sources = np.repeat(row_pages, np.diff(indptr))
+            targets = row_pages[indices]
+            G = nx.DiGraph()
+            G.add_edges_from(zip(sources.tolist(), targets.tolist()))
+            print_success(f"Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+
+            print_step("Computing NetworkX PageRank...")
+            nx_pr = nx.pagerank(G, alpha=alpha)
+
+            if cache_path is not None:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with atomic_write(cache_path) as f:
+                    np.savez(f,
+                             nodes=np.fromiter(nx_pr.keys(), dtype=np.int64, count=len(nx_pr)),
+                             scores=np.fromiter(nx_pr.values(), dtype=np.float64, count=len(nx_pr)))
+                print_success(f"Cached NetworkX PageRank to {cache_path}")
 
         # --- Align scores into parallel arrays (same page order) ---
-        pages = sorted(custom_pr.keys(), key=int)
-        custom_scores = np.array([custom_pr[p] for p in pages])
-        nx_scores = np.array([nx_pr.get(p, 0.0) for p in pages])
+        # np.fromiter fills each array straight from the dict lookups, with
+        # no intermediate Python list of N floats.
+        pages = sorted(custom_pr.keys())
+        n = len(pages)
+        custom_scores = np.fromiter(map(custom_pr.__getitem__, pages), dtype=np.float64, count=n)
+        nx_scores = np.fromiter(map(nx_pr.get, pages, itertools.repeat(0.0)), dtype=np.float64, count=n)
 
         # =============================================================
         # Metric 1 — Score-level comparison (MAE, Max Error)
@@ -175,8 +214,8 @@ def verify_with_networkx(outgoing, custom_pr):
         # =============================================================
         # Metric 3 — Top-5 side-by-side display
         # =============================================================
-        nx_top5 = sorted(nx_pr.items(), key=lambda x: x[1], reverse=True)[:5]
-        custom_top5 = sorted(custom_pr.items(), key=lambda x: x[1], reverse=True)[:5]
+        nx_top5 = top_k(pages, nx_scores)
+        custom_top5 = top_k(pages, custom_scores)
 
         custom_display = {f"#{i+1} Page {p}": f"{s:.8f}" for i, (p, s) in enumerate(custom_top5)}
         nx_display = {f"#{i+1} Page {p}": f"{s:.8f}" for i, (p, s) in enumerate(nx_top5)}
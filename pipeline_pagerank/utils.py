@@ -27,7 +27,8 @@
 #     but do not affect the correctness of the pipeline's computations.
 #
 # Components:
-#   Colors            — ANSI escape code constants for terminal styling.
+#   Colors            — ANSI escape code constants for terminal styling
+#                       (empty strings when stdout is not a terminal).
 #   print_project_banner — Project metadata banner (author, course, ref).
 #   print_stage / print_step / print_success / print_warning / print_error
 #                     — Hierarchical log output with color-coded prefixes.
@@ -38,10 +39,23 @@
 #   print_dict_sanity_check
 #                     — Quick preview of a page_id -> links dictionary.
 #   Timer             — Context manager that prints elapsed wall time.
-
+#   CACHE_DIR         — Where --cache runs keep Stage 1 and Stage 4 results.
+#   atomic_write      — Context manager that writes a cache file all-or-nothing.
+
+import contextlib
+import heapq
+import os
+import sys
+import tempfile
 import time
 
 
+# --cache keeps Stage 1's parsed links and Stage 4's NetworkX reference scores
+# here, so reruns skip the download and the reference computation; delete a
+# file (or the directory) to force a fresh run.
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cs528-pagerank')
+
+
 class Colors:
     HEADER = '\033[95m'
     BLUE = '\033[94m'
@@ -54,6 +68,25 @@ class Colors:
     RESET = '\033[0m'
 
 
+# Piped or redirected output (e.g. `python main.py | tee run.log`) gets plain
+# text: blank the codes before anything below bakes them into a prefix.
+# sys.stdout can be None (pythonw, detached process), hence the getattr.
+_isatty = getattr(sys.stdout, 'isatty', None)
+if _isatty is None or not _isatty():
+    for _name in ('HEADER', 'BLUE', 'CYAN', 'GREEN', 'YELLOW', 'RED', 'BOLD', 'DIM', 'RESET'):
+        setattr(Colors, _name, '')
+    del _name
+del _isatty
+
+
+# Constant line prefixes for the log helpers below, built once at import
+# rather than re-interpolated from the color codes on every call.
+_STEP_PREFIX = f"  {Colors.DIM}->{Colors.RESET} "
+_OK_PREFIX = f"  {Colors.GREEN}[OK]{Colors.RESET} "
+_WARN_PREFIX = f"  {Colors.YELLOW}[WARN]{Colors.RESET} "
+_ERR_PREFIX = f"  {Colors.RED}[ERR]{Colors.RESET} "
+
+
 def print_project_banner():
     """Print project info banner at pipeline start."""
     w = 90
@@ -75,22 +108,22 @@ def print_stage(name, message):
 
 def print_step(message):
     """Print a sub-step within a stage."""
-    print(f"  {Colors.DIM}->{Colors.RESET} {message}")
+    print(f"{_STEP_PREFIX}{message}")
 
 
 def print_success(message):
     """Print a success message."""
-    print(f"  {Colors.GREEN}[OK]{Colors.RESET} {message}")
+    print(f"{_OK_PREFIX}{message}")
 
 
 def print_warning(message):
     """Print a warning message."""
-    print(f"  {Colors.YELLOW}[WARN]{Colors.RESET} {message}")
+    print(f"{_WARN_PREFIX}{message}")
 
 
 def print_error(message):
     """Print an error message."""
-    print(f"  {Colors.RED}[ERR]{Colors.RESET} {message}")
+    print(f"{_ERR_PREFIX}{message}")
 
 
 def print_stat(label, value):
@@ -107,27 +140,20 @@ def print_summary_box(title, stats):
         stats (dict): Key-value pairs to display
     """
     width = 50
-    print(f"\n  +{'-' * width}+")
-    padded = title + ' ' * (width - 1 - len(title))
-    print(f"  | {Colors.BOLD}{padded}{Colors.RESET}|")
-    print(f"  +{'-' * width}+")
-    for key, val in stats.items():
-        line = f" {key}: {val}"
-        print(f"  |{line:<{width}}|")
-    print(f"  +{'-' * width}+\n")
+    lines = _build_box_lines(title, stats, width)
+    # One write per box: the frame reaches the terminal whole, not line by line.
+    print("\n" + "\n".join(f"  {line}" for line in lines) + "\n")
 
 
 def _build_box_lines(title, stats, width):
-    """Build a box as a list of strings for side-by-side rendering."""
+    """Build a box as a list of strings (shared by the single and side-by-side boxes)."""
     lines = []
     sep = f"+{'-' * width}+"
     lines.append(sep)
-    padded = title + ' ' * (width - 1 - len(title))
-    lines.append(f"| {Colors.BOLD}{padded}{Colors.RESET}|")
+    lines.append(f"| {Colors.BOLD}{title.ljust(width - 1)}{Colors.RESET}|")
     lines.append(sep)
     for key, val in stats.items():
-        content = f" {key}: {val}"
-        lines.append(f"|{content:<{width}}|")
+        lines.append(f"|{f' {key}: {val}'.ljust(width)}|")
     lines.append(sep)
     return lines
 
@@ -147,17 +173,15 @@ def print_side_by_side_boxes(title_l, stats_l, title_r, stats_r, col_width=38, g
     left = _build_box_lines(title_l, stats_l, col_width)
     right = _build_box_lines(title_r, stats_r, col_width)
 
-    # Pad shorter side so both have equal line count
-    empty = ' ' * (col_width + 2)
-    max_len = max(len(left), len(right))
-    left += [empty] * (max_len - len(left))
-    right += [empty] * (max_len - len(right))
+    # Pad shorter side so both have equal line count (usually they already do:
+    # the paired stats boxes have the same keys)
+    diff = len(left) - len(right)
+    if diff:
+        empty = ' ' * (col_width + 2)
+        (right if diff > 0 else left).extend([empty] * abs(diff))
 
     spacer = ' ' * gap
-    print()
-    for l, r in zip(left, right):
-        print(f"  {l}{spacer}{r}")
-    print()
+    print("\n" + "\n".join(f"  {l}{spacer}{r}" for l, r in zip(left, right)) + "\n")
 
 def print_dict_sanity_check(data, label="Data", num_preview=5):
     """
@@ -165,12 +189,13 @@ def print_dict_sanity_check(data, label="Data", num_preview=5):
     Works for both outgoing and incoming link dictionaries.
 
     Args:
-        data (dict): page_id (str) -> list of link targets/sources
+        data (dict): page_id (int) -> list of link targets/sources
         label (str): Label for display (e.g., "Outgoing", "Incoming")
         num_preview (int): Number of pages to preview
     """
-    total_links = sum(len(v) for v in data.values())
-    zero_links = sum(1 for v in data.values() if len(v) == 0)
+    counts = list(map(len, data.values()))
+    total_links = sum(counts)
+    zero_links = counts.count(0)
 
     print_summary_box(f"{label} Sanity Check", {
         "Total files": len(data),
@@ -180,22 +205,48 @@ def print_dict_sanity_check(data, label="Data", num_preview=5):
     })
 
     print_step(f"First {num_preview} pages (sorted by ID):")
-    for page_id in sorted(data.keys(), key=lambda x: int(x))[:num_preview]:
-        preview = data[page_id][:5]
-        print(f"      Page {page_id}: {len(data[page_id])} links -> {preview}...")
-    print()
+    # nsmallest keeps a num_preview-sized heap instead of sorting every ID;
+    # the preview lines go out in one write, like the summary boxes.
+    lines = [f"      Page {page_id}: {len(data[page_id])} links -> {data[page_id][:5]}..."
+             for page_id in heapq.nsmallest(num_preview, data)]
+    print("\n".join(lines) + "\n")
 
 class Timer:
     """Context manager for timing code blocks."""
+    # perf_counter_ns() is monotonic, so an NTP step during a long download
+    # cannot skew the reading the way time.time() could.
+    __slots__ = ('label', 'start', 'elapsed')
+
     def __init__(self, label="Operation"):
         self.label = label
         self.start = None
         self.elapsed = None
 
     def __enter__(self):
-        self.start = time.time()
+        self.start = time.perf_counter_ns()
         return self
 
     def __exit__(self, *args):
-        self.elapsed = time.time() - self.start
-        print_success(f"{self.label} completed in {self.elapsed:.2f}s")
\ No newline at end of file
+        self.elapsed = (time.perf_counter_ns() - self.start) / 1e9
+        print_success(f"{self.label} completed in {self.elapsed:.2f}s")
+
+
+@contextlib.contextmanager
+def atomic_write(path):
+    """
+    Open `path` for binary writing so that it only ever exists complete.
+
+    Data goes to a temp file in the same directory, which os.replace() moves
+    over `path` once the block finishes.  If the block raises (or the run is
+    interrupted), the temp file is removed and `path` is left as it was, so a
+    later exists() check never finds a half-written cache file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise